@@ -52,6 +52,7 @@ class MessageHandler(EventHandler):
         for (i, n) in enumerate(neighbours):
             self.interface_map[i] = n
             self.interface_inv_map[n] = i
+        self._nbrs = None
 
         # delays functionality
         self._delay_seq = 0
@@ -150,6 +151,7 @@ class MessageHandler(EventHandler):
             nbr = event.neighbour
             self.interface_map[iid] = nbr
             self.interface_inv_map[nbr] = iid
+            self._nbrs = None
             found_msgs = [OutMessage(self.id, nbr, m) for m in self._lost_msgs.pop(nbr, [])]
 
             return found_msgs + self.addLink(nbr, event.params)
@@ -157,11 +159,21 @@ class MessageHandler(EventHandler):
             iid = event.interface
             nbr = self.interface_map.pop(iid)
             del self.interface_inv_map[nbr]
+            self._nbrs = None
 
             return self.removeLink(nbr)
         else:
             raise UnsupportedEventType(event)
 
+    def neighbours(self) -> Tuple[AgentId, ...]:
+        """
+        Returns currently connected neighbours. The tuple is cached
+        until the next interface setup or shutdown.
+        """
+        if self._nbrs is None:
+            self._nbrs = tuple(self.interface_map.values())
+        return self._nbrs
+
     def addLink(self, other: AgentId, params={}) -> List[WorldEvent]:
         """
         Should be overridden by subclasses
@@ -199,10 +211,13 @@ class MessageHandler(EventHandler):
 
     def broadcast(self, msg: Message, exclude=[]) -> List[Message]:
         """
-        Send a copy of a message to all neighbours, excluding given
+        Send a copy of a message to all neighbours, excluding given.
+        The copy is made once and shared by all the recipients, so
+        they should not modify it.
         """
-        return [OutMessage(self.id, v, deepcopy(msg))
-                for v in (set(self.interface_map.values()) - set(exclude))]
+        msg = deepcopy(msg)
+        return [OutMessage(self.id, v, msg)
+                for v in self.neighbours() if v not in exclude]
 
 class Oracle(MessageHandler):
     pass
@@ -257,36 +272,50 @@ class Router(MessageHandler):
     """
     Agent which routes packages and service messages.
     """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # package events are dispatched by their exact type
+        self._event_handlers = {
+            PkgEnqueuedEvent: self._handleEnqueuedPkg,
+            PkgProcessingEvent: self._handleProcessingPkg,
+        }
+        # routing decisions are logged only if debug logging was enabled
+        # when the router was created
+        self._log_routes = logger.isEnabledFor(logging.DEBUG)
+
     def handleEvent(self, event: WorldEvent) -> List[WorldEvent]:
-        if isinstance(event, PkgEnqueuedEvent):
-            assert event.recipient == self.id, \
-                "Wrong recipient of PkgEnqueuedEvent!"
-            return self.detectEnqueuedPkg(event.sender, event.pkg)
-
-        elif isinstance(event, PkgProcessingEvent):
-            assert event.recipient == self.id, \
-                "Wrong recipient of PkgProcessingEvent!"
-
-            pkg = event.pkg
-            if pkg.dst == self.id:
-                return [PkgReceiveAction(pkg)]
-            else:
-                #self.log('Processing pkg #{} on router {}'.format(pkg.id, self.id[1]))
-                sender = event.sender
-                allowed_nbrs = event.allowed_nbrs
-                if allowed_nbrs is None:
-                    allowed_nbrs = list(self.interface_map.values())
+        handler = self._event_handlers.get(type(event))
+        if handler is None:
+            return super().handleEvent(event)
+        return handler(event)
 
-                to_nbr, additional_msgs = self.route(sender, pkg, allowed_nbrs)
-                assert to_nbr in allowed_nbrs, "Resulting neighbour is not among allowed!"
-                pkg.node_path.append(self.id)
+    def _handleEnqueuedPkg(self, event: PkgEnqueuedEvent) -> List[WorldEvent]:
+        assert event.recipient == self.id, \
+            "Wrong recipient of PkgEnqueuedEvent!"
+        return self.detectEnqueuedPkg(event.sender, event.pkg)
 
-                logger.debug('Routing pkg #{} on router {} to router {}'.format(pkg.id, self.id[1], to_nbr[1]))
-                #self.log('Routing pkg #{} on router {} to router {}'.format(pkg.id, self.id[1], to_nbr[1]))
-                return [PkgRouteAction(to_nbr, pkg)] + additional_msgs
+    def _handleProcessingPkg(self, event: PkgProcessingEvent) -> List[WorldEvent]:
+        assert event.recipient == self.id, \
+            "Wrong recipient of PkgProcessingEvent!"
 
+        pkg = event.pkg
+        if pkg.dst == self.id:
+            return [PkgReceiveAction(pkg)]
         else:
-            return super().handleEvent(event)
+            #self.log('Processing pkg #{} on router {}'.format(pkg.id, self.id[1]))
+            sender = event.sender
+            allowed_nbrs = event.allowed_nbrs
+            if allowed_nbrs is None:
+                allowed_nbrs = self.neighbours()
+
+            to_nbr, additional_msgs = self.route(sender, pkg, allowed_nbrs)
+            assert to_nbr in allowed_nbrs, "Resulting neighbour is not among allowed!"
+            pkg.node_path.append(self.id)
+
+            if self._log_routes:
+                logger.debug('Routing pkg #%s on router %s to router %s', pkg.id, self.id[1], to_nbr[1])
+            #self.log('Routing pkg #{} on router {} to router {}'.format(pkg.id, self.id[1], to_nbr[1]))
+            return [PkgRouteAction(to_nbr, pkg)] + additional_msgs
 
     def detectEnqueuedPkg(self, sender: AgentId, pkg: Package) -> List[WorldEvent]:
         return []
@@ -75,6 +75,9 @@ class DQNRouter(LinkStateRouter, RewardAgent):
         self.use_reinforce = use_reinforce
         self.use_combined_model = use_combined_model
 
+        # adjacency matrix input, cached until the next topology change
+        self._amatrix = None
+
         # changed by Igor: brain loading process
         def load_brain():
             b = brain
@@ -143,13 +146,18 @@ class DQNRouter(LinkStateRouter, RewardAgent):
         self.optimizer.step()
         return float(loss)
 
+    def _topologyChanged(self):
+        super()._topologyChanged()
+        self._amatrix = None
+
     def _getAddInput(self, tag, *args, **kwargs):
         if tag == 'amatrix':
-            amatrix = nx.convert_matrix.to_numpy_array(
-                self.network, nodelist=self.nodes, weight=self.edge_weight,
-                dtype=np.float32)
-            gstate = np.ravel(amatrix)
-            return gstate
+            if self._amatrix is None:
+                amatrix = nx.convert_matrix.to_numpy_array(
+                    self.network, nodelist=self.nodes, weight=self.edge_weight,
+                    dtype=np.float32)
+                self._amatrix = np.ravel(amatrix)
+            return self._amatrix
         else:
             raise Exception('Unknown additional input: ' + tag)
 
@@ -280,6 +288,7 @@ class DQNRouterEmb(DQNRouterOO):
         return self.embedding.transform(node).astype(np.float32)
 
     def networkStateChanged(self):
+        super().networkStateChanged()
         num_nodes = len(self.network.nodes)
         num_edges = len(self.network.edges)
 
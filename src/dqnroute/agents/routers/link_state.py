@@ -1,6 +1,10 @@
 import random
 import pprint
 import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
 
 from copy import deepcopy
 from typing import List, Tuple, Dict
@@ -80,32 +84,47 @@ class LinkStateRouter(Router, AbstractStateHandler):
         for (m, params) in adj_links.items():
             self.network.add_edge(self.id, m, **params)
 
+        # shortest paths from this node, recomputed lazily after topology changes
+        self._next_hop = None
+        self._path_len = None
+        self._csgraph = None
+        self._min_link_len = None
+
     def addLink(self, to: AgentId, params={}) -> List[Message]:
         msgs = super().addLink(to, params)
         self.network.add_edge(to, self.id, **params)
         self.network.add_edge(self.id, to, **params)
+        self._topologyChanged()
         return msgs + self._announceState()
 
     def removeLink(self, to: AgentId) -> List[Message]:
         msgs = super().removeLink(to)
         self.network.remove_edge(to, self.id)
         self.network.remove_edge(self.id, to)
+        self._topologyChanged()
         return msgs + self._announceState()
 
     def route(self, sender: AgentId, pkg: Package, allowed_nbrs: List[AgentId]) -> Tuple[AgentId, List[Message]]:
         if len(allowed_nbrs) == 1:
             return allowed_nbrs[0], []
 
-        path = nx.dijkstra_path(self.network, self.id, pkg.dst, weight=self.edge_weight)
-        if path[1] in allowed_nbrs:
-            return path[1], []
+        # do not recompute shortest paths if the direct link is surely one of them
+        if self._next_hop is None and pkg.dst in allowed_nbrs and self._isShortestLink(pkg.dst):
+            return pkg.dst, []
+
+        next_hop = self._nextHop(pkg.dst)
+        if next_hop in allowed_nbrs:
+            return next_hop, []
 
         else:
+            # distances from all the allowed neighbours at once
+            nodes, node_idx, G = self._csgraph
+            plens = csgraph_dijkstra(G, indices=[node_idx[nbr] for nbr in allowed_nbrs])[:, node_idx[pkg.dst]]
+
             min_nbr = None
             min_len = INFTY
-            for nbr in allowed_nbrs:
+            for (nbr, plen) in zip(allowed_nbrs, plens):
                 elen = self.network[self.id][nbr][self.edge_weight]
-                plen = nx.dijkstra_path_length(self.network, nbr, pkg.dst, weight=self.edge_weight)
                 if elen + plen < min_len:
                     min_nbr = nbr
                     min_len = elen + plen
@@ -114,12 +133,98 @@ class LinkStateRouter(Router, AbstractStateHandler):
 
     def pathCost(self, to: AgentId, through=None) -> float:
         if through is None:
-            return nx.dijkstra_path_length(self.network, self.id, to, weight=self.edge_weight)
+            self._computeRoutes()
+            try:
+                return self._path_len[to]
+            except KeyError:
+                raise nx.NetworkXNoPath('Node {} not reachable from {}'.format(to, self.id))
         else:
             l1 = nx.dijkstra_path_length(self.network, self.id, through, weight=self.edge_weight)
             l2 = nx.dijkstra_path_length(self.network, through, self.id, weight=self.edge_weight)
             return l1 + l2
 
+    def networkStateChanged(self):
+        self._topologyChanged()
+
+    def _topologyChanged(self):
+        """
+        Drops everything computed from the current network graph.
+        Subclasses caching other graph-derived data should extend it.
+        """
+        self._next_hop = None
+        self._path_len = None
+        self._csgraph = None
+        self._min_link_len = None
+
+    def _isShortestLink(self, to: AgentId) -> bool:
+        """
+        Checks whether the direct link to a neighbour is a shortest path to it.
+        With non-negative weights any other path is at least as long as
+        the lightest outgoing link, so no Dijkstra run is needed.
+        """
+        out_links = self.network.adj[self.id]
+        if self._min_link_len is None:
+            self._min_link_len = min((params.get(self.edge_weight, 1) for params in out_links.values()),
+                                     default=INFTY)
+        params = out_links.get(to)
+        return params is not None and params.get(self.edge_weight, 1) <= self._min_link_len
+
+    def _mkCSGraph(self):
+        """
+        Converts the network to a CSR matrix over integer node labels.
+        Returns the list of nodes, the inverse mapping and the matrix.
+        """
+        nodes = list(self.network.nodes)
+        node_idx = {v: i for (i, v) in enumerate(nodes)}
+        indptr = [0]
+        indices = []
+        weights = []
+        for u in nodes:
+            for (v, params) in self.network.adj[u].items():
+                indices.append(node_idx[v])
+                weights.append(params.get(self.edge_weight, 1))
+            indptr.append(len(indices))
+
+        n = len(nodes)
+        G = sp.csr_matrix((np.array(weights, dtype=float), np.array(indices, dtype=int),
+                           np.array(indptr, dtype=int)), shape=(n, n))
+        return nodes, node_idx, G
+
+    def _computeRoutes(self):
+        """
+        Runs Dijkstra from this node once and caches distances and
+        next hops to every reachable node until the next topology change.
+        """
+        if self._next_hop is None:
+            nodes, node_idx, G = self._csgraph = self._mkCSGraph()
+            src = node_idx[self.id]
+            dist, pred = csgraph_dijkstra(G, indices=src, return_predecessors=True)
+
+            # next hop of a node is the one of its predecessor, unless
+            # the predecessor is this node itself
+            hop = {}
+            for i in range(len(nodes)):
+                if i == src or np.isinf(dist[i]):
+                    continue
+                chain = []
+                j = i
+                while j not in hop and pred[j] != src:
+                    chain.append(j)
+                    j = pred[j]
+                h = hop.get(j, j)
+                for k in chain + [j]:
+                    hop[k] = h
+
+            self._path_len = {nodes[i]: float(d) for (i, d) in enumerate(dist) if not np.isinf(d)}
+            self._next_hop = {nodes[i]: nodes[h] for (i, h) in hop.items()}
+
+    def _nextHop(self, to: AgentId) -> AgentId:
+        self._computeRoutes()
+        try:
+            return self._next_hop[to]
+        except KeyError:
+            raise nx.NetworkXNoPath('Node {} not reachable from {}'.format(to, self.id))
+
     def getState(self):
         return self.network.adj[self.id]
 
@@ -131,13 +236,14 @@ class LinkStateRouter(Router, AbstractStateHandler):
                 self.network.add_edge(node, m, **params)
                 changed = True
 
-        for m in set(self.network.nodes()) - set(neighbours.keys()):
-            try:
-                self.network.remove_edge(node, m)
-                changed = True
-            except nx.NetworkXError:
-                pass
+        # only existing out-edges of the node can become stale
+        if node in self.network:
+            stale = [m for m in self.network.successors(node) if m not in neighbours]
+            self.network.remove_edges_from((node, m) for m in stale)
+            changed = changed or len(stale) > 0
 
+        if changed:
+            self._topologyChanged()
         return changed, []
 
 
@@ -189,6 +189,7 @@ class PPORouterEmb(LinkStateRouter, RewardAgent):
         return self.critic.forward(addr_emb, dst_emb).clone().detach()
 
     def networkStateChanged(self):
+        super().networkStateChanged()
         num_nodes = len(self.network.nodes)
         num_edges = len(self.network.edges)
 
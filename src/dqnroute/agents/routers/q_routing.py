@@ -1,54 +1,100 @@
 import networkx as nx
+import numpy as np
 import random
 
 from typing import List, Tuple, Dict
 from ..base import *
 from .link_state import *
 from ...messages import *
-from ...utils import dict_min
 
 class SimpleQRouter(Router, RewardAgent):
     """
-    A router which implements Q-routing algorithm
+    A router which implements Q-routing algorithm.
+    Q-values are stored in a (destination x neighbour) matrix indexed by
+    positions of nodes in `nodes`.
     """
     def __init__(self, learning_rate: float, nodes: List[AgentId], **kwargs):
         super().__init__(**kwargs)
         self.learning_rate = learning_rate
         self.nodes = nodes
-        self.Q = {u: {v: 0 if u == v else 10
-                      for v in self.interface_map.values()}
-                  for u in self.nodes}
+        self._node_idx = {u: i for (i, u) in enumerate(self.nodes)}
+
+        n = len(self.nodes)
+        self.Q = np.full((n, n), 10, dtype=np.float32)
+        np.fill_diagonal(self.Q, 0)
+
+        # best neighbour for each destination among all current neighbours,
+        # -1 if it should be recomputed
+        self._best_nbr = np.full(n, -1, dtype=int)
+        self._nbr_mask = np.zeros(n, dtype=bool)
+        self._nbr_mask[self._nbrIdx(self.neighbours())] = True
 
     def addLink(self, to: AgentId, params={}) -> List[Message]:
         msgs = super().addLink(to, params)
-        for (u, dct) in self.Q.items():
-            if to not in dct:
-                dct[to] = 0 if u == to else 10
+        self._nbr_mask[self._node_idx[to]] = True
+        self._best_nbr.fill(-1)
+        return msgs
+
+    def removeLink(self, to: AgentId) -> List[Message]:
+        msgs = super().removeLink(to)
+        self._nbr_mask[self._node_idx[to]] = False
+        self._best_nbr.fill(-1)
         return msgs
 
     def route(self, sender: AgentId, pkg: Package, allowed_nbrs: List[AgentId]) -> Tuple[AgentId, List[Message]]:
-        Qs = self._Q(pkg.dst, allowed_nbrs)
-        to, estimate = dict_min(Qs)
-        reward_msg = self.registerResentPkg(pkg, estimate, to, pkg.dst)
+        di = self._node_idx[pkg.dst]
+        if allowed_nbrs is self.neighbours():
+            ai = self._bestNbr(di)
+            to = self.nodes[ai]
+        else:
+            idx = self._nbrIdx(allowed_nbrs)
+            k = self.Q[di, idx].argmin()
+            to, ai = allowed_nbrs[k], idx[k]
+        reward_msg = self.registerResentPkg(pkg, float(self.Q[di, ai]), to, (di, ai))
 
         return to, [OutMessage(self.id, sender, reward_msg)] if sender[0] != 'world' else []
 
     def pathCost(self, to: AgentId) -> float:
-        return min(self._Q(to, list(self.interface_map.values())).values())
+        di = self._node_idx[to]
+        return float(self.Q[di, self._bestNbr(di)])
 
     def handleMsgFrom(self, sender: AgentId, msg: Message) -> List[Message]:
         if isinstance(msg, RewardMsg):
-            action, Q_new, dst = self.receiveReward(msg)
-            self.Q[dst][action] += self.learning_rate * (Q_new - self.Q[dst][action])
+            _, Q_new, (di, ai) = self.receiveReward(msg)
+            self._updateQ(di, ai, Q_new)
             return []
         else:
             return super().handleMsgFrom(sender, msg)
 
-    def _Q(self, d: int, allowed_nbrs: List[AgentId]) -> Dict[int, float]:
+    def _updateQ(self, di: int, ai: int, Q_new: float) -> float:
+        """
+        Moves `Q[di, ai]` towards `Q_new` and keeps the best neighbour
+        of `di` up to date. Returns the difference between `Q_new` and the old value.
         """
-        Returns a dict which only includes available neighbours
+        dQ = Q_new - self.Q[di, ai]
+        self.Q[di, ai] += self.learning_rate * dQ
+
+        best = self._best_nbr[di]
+        if best == ai:
+            if dQ > 0:
+                self._best_nbr[di] = -1
+        elif best >= 0 and self._nbr_mask[ai] and self.Q[di, ai] < self.Q[di, best]:
+            self._best_nbr[di] = ai
+        return dQ
+
+    def _bestNbr(self, di: int) -> int:
         """
-        return {n: self.Q[d][n] for n in allowed_nbrs}
+        Returns the index of the neighbour with the smallest Q-value for destination `di`
+        """
+        ai = self._best_nbr[di]
+        if ai < 0:
+            idx = self._nbrIdx(self.neighbours())
+            ai = idx[self.Q[di, idx].argmin()]
+            self._best_nbr[di] = ai
+        return ai
+
+    def _nbrIdx(self, nbrs: List[AgentId]) -> List[int]:
+        return [self._node_idx[n] for n in nbrs]
 
 
 class PredictiveQRouter(SimpleQRouter, RewardAgent):
@@ -56,61 +102,52 @@ class PredictiveQRouter(SimpleQRouter, RewardAgent):
         super().__init__(**kwargs)
         self.beta = beta
         self.gamma = gamma
-        self.B = deepcopy(self.Q)
-        self.R = {u: {v: 0 for v in self.interface_map.values()}
-                  for u in self.nodes}
-        self.U = {u: {v: 0 for v in self.interface_map.values()}
-                  for u in self.nodes}
+        self.B = self.Q.copy()
+        self.R = np.zeros_like(self.Q)
+        self.U = np.zeros(self.Q.shape)
+        self._seen_nbrs = set(self.neighbours())
 
     def addLink(self, to: AgentId, params={}) -> List[Message]:
         msgs = super().addLink(to, params)
-        for u in self.nodes:
-            if to not in self.B[u]:
-                self.B[u][to] = 0 if u == to else self.Q[u][to]
-            if to not in self.R[u]:
-                self.R[u][to] = 0
-            if to not in self.U[u]:
-                self.U[u][to] = self.env.time()
+        if to not in self._seen_nbrs:
+            self._seen_nbrs.add(to)
+            self.U[:, self._node_idx[to]] = self.env.time()
         return msgs
 
     def route(self, sender: AgentId, pkg: Package, allowed_nbrs: List[AgentId]) -> Tuple[AgentId, List[Message]]:
-        Qs = self._Q(pkg.dst, allowed_nbrs)
-        Qs_altered = self._Q_altered(pkg.dst, allowed_nbrs)
-        to, _ = dict_min(Qs_altered)
-        estimate = min(Qs.values())
-        reward_msg = self.registerResentPkg(pkg, estimate, to, pkg.dst)
+        di, idx = self._node_idx[pkg.dst], self._nbrIdx(allowed_nbrs)
+        Qs = self.Q[di, idx]
+        k = self._Q_altered(di, idx).argmin()
+        to = allowed_nbrs[k]
+        estimate = float(Qs.min())
+        reward_msg = self.registerResentPkg(pkg, estimate, to, (di, idx[k]))
 
         return to, [OutMessage(self.id, sender, reward_msg)] if sender[0] != 'world' else []
 
     def handleMsgFrom(self, sender: AgentId, msg: Message) -> List[Message]:
         if isinstance(msg, RewardMsg):
-            action, Q_new, dst = self.receiveReward(msg)
-            dQ = Q_new - self.Q[dst][action]
-            self.Q[dst][action] += self.learning_rate * dQ
-            self.B[dst][action] = min(self.B[dst][action], self.Q[dst][action])
+            _, Q_new, (di, ai) = self.receiveReward(msg)
+            dQ = self._updateQ(di, ai, Q_new)
+            self.B[di, ai] = min(self.B[di, ai], self.Q[di, ai])
 
             now = self.env.time()
             if dQ < 0:
-                dR = dQ / (now - self.U[dst][action])
-                self.R[dst][action] += self.beta * dR
+                dR = dQ / (now - self.U[di, ai])
+                self.R[di, ai] += self.beta * dR
             elif dQ > 0:
-                self.R[dst][action] *= self.gamma
+                self.R[di, ai] *= self.gamma
 
-            self.U[dst][action] = now
+            self.U[di, ai] = now
             return []
         else:
             return super().handleMsgFrom(sender, msg)
 
-    def _Q_altered(self, d: int, allowed_nbrs: List[AgentId]) -> Dict[int, float]:
+    def _Q_altered(self, di: int, idx: List[int]) -> np.ndarray:
         """
-        Returns estimates for all available neighbours
+        Returns estimates for all available neighbours, given their indices
         """
-        now = self.env.time()
-        res = {}
-        for n in allowed_nbrs:
-            dt = now - self.U[d][n]
-            res[n] = max(self.Q[d][n] + dt * self.R[d][n], self.B[d][n])
-        return res
+        dt = self.env.time() - self.U[di, idx]
+        return np.maximum(self.Q[di, idx] + dt * self.R[di, idx], self.B[di, idx])
 
 class SimpleQRouterNetwork(NetworkRewardAgent, SimpleQRouter):
     """
@@ -238,6 +238,7 @@ class Reinforce(LinkStateRouter, RewardAgent):
         return self.actor.forward(addr_emb, dst_emb)
 
     def networkStateChanged(self):
+        super().networkStateChanged()
         num_nodes = len(self.network.nodes)
         num_edges = len(self.network.edges)
 
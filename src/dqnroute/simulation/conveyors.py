@@ -537,7 +537,7 @@ class ConveyorsRunner(SimulationRunner):
                         PackageHistory.started_packages.add(bag_id)
 
                         bag = Bag(bag_id, ('sink', dst), self.env.now, None)
-                        logger.debug(f"Sending random bag #{bag_id} from {src} to {dst} at time {self.env.now}")
+                        logger.debug("Sending random bag #%s from %s to %s at time %s", bag_id, src, dst, self.env.now)
                         yield self.world.handleWorldEvent(BagAppearanceEvent(src, bag))
 
                         bag_id += 1
@@ -91,12 +91,20 @@ class NetworkEnvironment(MultiAgentEnv):
 
         super().__init__(**kwargs)
 
+        # link parameters are copied out of the connection graph once, as it
+        # never changes during the simulation (see `handleConnGraphChange`)
         self.link_queues = {}
+        self.link_latency = {}
+        self.link_inv_bandwidth = {}
         self.router_queues = {}
         for router_id in self.conn_graph.nodes:
             self.link_queues[router_id] = {}
-            for _, nbr in self.conn_graph.edges(router_id):
+            self.link_latency[router_id] = {}
+            self.link_inv_bandwidth[router_id] = {}
+            for _, nbr, params in self.conn_graph.edges(router_id, data=True):
                 self.link_queues[router_id][nbr] = Resource(self.env, capacity=1)
+                self.link_latency[router_id][nbr] = params['latency']
+                self.link_inv_bandwidth[router_id][nbr] = 1.0 / params['bandwidth']
             self.router_queues[router_id] = Resource(self.env, capacity=1)
 
     def makeConnGraph(self, network_cfg, **kwargs) -> nx.Graph:
@@ -120,7 +128,7 @@ class NetworkEnvironment(MultiAgentEnv):
             return Event(self.env).succeed()
 
         elif isinstance(action, PkgReceiveAction):
-            logger.debug(f"Package #{action.pkg.id} received at node {from_agent[1]} at time {self.env.now}")
+            logger.debug("Package #%s received at node %s at time %s", action.pkg.id, from_agent[1], self.env.now)
 
             self.data_series.logEvent(self.env.now, self.env.now - action.pkg.start_time)
             return Event(self.env).succeed()
@@ -136,15 +144,14 @@ class NetworkEnvironment(MultiAgentEnv):
             return super().handleWorldEvent(event)
 
     def _edgeTransfer(self, from_agent: AgentId, to_agent: AgentId, pkg: Package):
-        logger.debug(f"Package #{pkg.id} hop: {from_agent[1]} -> {to_agent[1]}")
+        logger.debug("Package #%s hop: %s -> %s", pkg.id, from_agent[1], to_agent[1])
 
-        edge_params = self.conn_graph[from_agent][to_agent]
-        latency = edge_params['latency']
-        bandwidth = edge_params['bandwidth']
+        latency = self.link_latency[from_agent][to_agent]
+        inv_bandwidth = self.link_inv_bandwidth[from_agent][to_agent]
 
         with self.link_queues[from_agent][to_agent].request() as req:
             yield req
-            yield self.env.timeout(pkg.size / bandwidth)
+            yield self.env.timeout(pkg.size * inv_bandwidth)
 
         yield self.env.timeout(latency)
         self.handleWorldEvent(PkgEnqueuedEvent(from_agent, to_agent, pkg))
@@ -247,7 +254,7 @@ class NetworkRunner(SimulationRunner):
                     for src in srcs:
                         dst = random.choice(dests)
                         pkg = Package(pkg_id, DEF_PKG_SIZE, dst, self.env.now, None)  # create empty packet
-                        logger.debug(f"Sending random pkg #{pkg_id} from {src} to {dst} at time {self.env.now}")
+                        logger.debug("Sending random pkg #%s from %s to %s at time %s", pkg_id, src, dst, self.env.now)
                         yield self.world.handleWorldEvent(PkgEnqueuedEvent(('world', 0), src, pkg))
                         pkg_id += 1
                     yield self.env.timeout(delta)
@@ -0,0 +1,46 @@
+import unittest
+import networkx as nx
+import numpy as np
+
+from dqnroute.utils import *
+from dqnroute.messages import Package
+
+class TestNeuralState(unittest.TestCase):
+    def setUp(self):
+        self.pkg = Package(7, DEF_PKG_SIZE, 2, 0, None)
+
+    def test_undirected(self):
+        G = nx.Graph()
+        G.add_edge(0, 1, weight=2)
+        G.add_edge(1, 2, weight=3)
+
+        expected = [2, 1, 5, 7] + \
+                   [1, 0, 1] + \
+                   [0, 1, 0, 1, 0, 1, 0, 1, 0] + \
+                   [-INFTY, -INFTY, -INFTY]
+        np.testing.assert_array_equal(mk_current_neural_state(G, 5, self.pkg, 1), expected)
+
+    def test_directed(self):
+        G = nx.DiGraph()
+        G.add_edge(1, 0, weight=2)
+        G.add_edge(1, 2, weight=5)
+        G.add_edge(0, 2, weight=1)
+
+        expected = [2, 1, 5, 7] + \
+                   [1, 0, 1] + \
+                   [0, 0, 1, 1, 0, 1, 0, 0, 0] + \
+                   [-3, -INFTY, -5]
+        np.testing.assert_array_equal(mk_current_neural_state(G, 5, self.pkg, 1), expected)
+
+    def test_out_buffer(self):
+        G = nx.DiGraph()
+        G.add_edge(1, 0, weight=2)
+        G.add_edge(0, 2, weight=1)
+
+        out = np.full(4 + 2*3 + 3*3, 42.0)
+        res = mk_current_neural_state(G, 5, self.pkg, 1, out=out)
+        self.assertIs(res, out)
+        np.testing.assert_array_equal(res, mk_current_neural_state(G, 5, self.pkg, 1))
+
+if __name__ == '__main__':
+    unittest.main()
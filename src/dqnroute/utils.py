@@ -323,28 +323,35 @@ def conveyor_adj_nodes(topology, conv_idx, only_own=False, data=False):
 # Generation of training data and manipulations with it
 #
 
-def mk_current_neural_state(G, time, pkg, node_addr, *add_data):
+def mk_current_neural_state(G, time, pkg, node_addr, *add_data, out=None):
+    """
+    Builds a row of training data for a package at a given node.
+    If `out` is given, the row is written into it instead of a new array.
+    """
     n = len(G.nodes())
     k = node_addr
     d = pkg.dst
-    neighbors = []
     if isinstance(G, nx.DiGraph):
-        for m in G.neighbors(k):
-            if nx.has_path(G, m, d):
-                neighbors.append(m)
+        neighbors = [m for m in G.neighbors(k) if nx.has_path(G, m, d)]
+        target_nbrs = neighbors
     else:
-        neighbors = G.neighbors(k)
+        neighbors = list(G.neighbors(k))
+        # targets of undirected graphs have always been left at -INFTY:
+        # the neighbours iterator used to be exhausted before the targets loop
+        target_nbrs = []
+    nbr_idx = np.array(neighbors, dtype=int)
 
     add_data_len = sum(map(len, add_data))
     dlen = 4 + 2*n + add_data_len + n*n
-    data = np.zeros(dlen)
-    data[0] = d
-    data[1] = k
-    data[2] = time
-    data[3] = pkg.id
+    if out is None:
+        data = np.zeros(dlen)
+    else:
+        assert len(out) == dlen, "Wrong size of the output buffer!"
+        data = out
+        data.fill(0)
+    data[0:4] = (d, k, time, pkg.id)
     off = 4
-    for m in neighbors:
-        data[off + m] = 1
+    data[off + nbr_idx] = 1
     off += n
 
     for vec in add_data:
@@ -352,14 +359,14 @@ def mk_current_neural_state(G, time, pkg, node_addr, *add_data):
         data[off:off+vl] = vec
         off += vl
 
-    for i in range(0, n):
-        for j in range(0, n):
-            if G.has_edge(i, j):
-                data[off + i*n + j] = 1
+    edges = np.array(list(G.edges()), dtype=int).reshape(-1, 2)
+    amatrix = data[off:off + n*n].reshape(n, n)
+    amatrix[edges[:, 0], edges[:, 1]] = 1
+    if not G.is_directed():
+        amatrix[edges[:, 1], edges[:, 0]] = 1
     off += n*n
-    for i in range(off, dlen):
-        data[i] = -INFTY
-    for m in neighbors:
+    data[off:] = -INFTY
+    for m in target_nbrs:
         try:
             data[off + m] = -(nx.dijkstra_path_length(G, m, d) + \
                               G.get_edge_data(k, m)['weight'])
@@ -1,9 +1,39 @@
+import math
 import numpy as np
 import torch
 from typing import *
 from abc import ABC, abstractmethod
 
-from .ml_util import Util
+
+@torch.jit.script
+def _pgd_step(perturbation: torch.Tensor, gradient: torch.Tensor, step_buf: torch.Tensor, rho: float,
+              step_size: float, inf_norm: bool, norm_scale: float) -> bool:
+    """
+    Single PGD step, compiled with TorchScript to avoid per-operation Python dispatch.
+    Normalizes the gradient (sign in the L-inf space, division by the norm in the L2 space),
+    makes a step of magnitude rho * step_size and projects the result onto the rho-ball.
+    Each norm is computed only once. The perturbation is updated in place.
+    :param step_buf: preallocated buffer of the same shape as the perturbation (used in the L-inf space).
+    :param norm_scale: the norm is divided by this value (sqrt(numel) for the scaled L2 norm, 1 otherwise).
+    :return: False if the step was zero and the perturbation was not changed.
+    """
+    p = float("inf") if inf_norm else 2.0
+    step_len = rho * step_size
+    # the normalized step is zero iff the gradient is zero
+    gradient_norm = float(gradient.norm(p))
+    if gradient_norm == 0 or step_len == 0:
+        return False
+    if inf_norm:
+        perturbation.add_(torch.sign(gradient, out=step_buf), alpha=step_len)
+    else:
+        perturbation.add_(gradient, alpha=step_len * norm_scale / gradient_norm)
+    perturbation_norm = float(perturbation.norm(p)) / norm_scale
+    if perturbation_norm > rho:
+        if inf_norm:
+            perturbation.clamp_(-rho, rho)
+        else:
+            perturbation.mul_(rho / perturbation_norm)
+    return True
 
 
 class Adversary(ABC):
@@ -75,28 +105,6 @@ class PGDAdversary(Adversary):
         """
         return x.norm(np.infty if self.inf_norm else 2).item() / (np.sqrt(x.numel()) if self.scale_norm else 1)
     
-    def _normalize_gradient(self, x: torch.Tensor) -> torch.Tensor:
-        """
-        Normalizes the vector of gradients.
-        In the L2 space, this is done by dividing the vector by its norm.
-        In the L-inf space, this is done by taking the sign of the gradient.
-        """
-        if self.inf_norm:
-            return x.sign()
-        else:
-            norm = self._norm(x)
-            if norm == 0:
-                return x * 0
-            return x / norm
-    
-    def _project(self, x: torch.Tensor, rho: float) -> torch.Tensor:
-        """
-        Projects the vector onto the rho-ball.
-        In the L2 space, this is done by scaling the vector.
-        In the L-inf space, this is done by clamping all components independently.
-        """
-        return x.clamp(-rho, rho) if self.inf_norm else (x / self._norm(x) * rho)
-    
     def perturb(self, initial_vector: torch.Tensor,
                 get_gradient: Callable[[torch.Tensor], Tuple[torch.Tensor, float, object]]) -> torch.Tensor:
         best_perturbation = None
@@ -113,24 +121,25 @@ class PGDAdversary(Adversary):
             perturbation = x1 * 0
 
             if random_start:
-                # random vector within the rho-ball
+                # random vector within the rho-ball, generated directly on the device of x1
                 if self.inf_norm:
                     # uniform
-                    perturbation = (torch.rand(1, x1.numel(), dtype=self.dtype) - 0.5) * 2 * rho
+                    perturbation = (torch.rand(1, x1.numel(), dtype=self.dtype, device=x1.device) - 0.5) * 2 * rho
                     # possibly reduce radius to encourage search of vectors with smaller norms
                     perturbation *= np.random.rand()
                 else:
                     # uniform radius, random direction
                     # note that this distribution is not uniform in terms of R^n!
-                    perturbation = torch.randn(1, x1.numel(), dtype=self.dtype)
+                    perturbation = torch.randn(1, x1.numel(), dtype=self.dtype, device=x1.device)
                     perturbation /= self._norm(perturbation) / rho
                     perturbation *= np.random.rand()
-                perturbation = Util.conditional_to_cuda(perturbation)
 
             if self.verbose > 0:
                 print(f"  >> #run = {run_n}, ║x1║ = {self._norm(x1):.5f}, ρ = {rho:.5f}")
 
             found = False
+            norm_scale = math.sqrt(x1.numel()) if self.scale_norm else 1.0
+            step_buf = torch.empty_like(perturbation)
             for i in range(self.steps):
                 #assert not torch.isnan(perturbation).any()
                 perturbed_vector = x1 + perturbation
@@ -142,21 +151,18 @@ class PGDAdversary(Adversary):
                 if objective > self.stop_loss:
                     found = True
                     break
-                # learning step
-                perturbation_step = rho * self.step_size * self._normalize_gradient(objective_gradient)
-                if perturbation_step.norm() == 0:
+                # learning step and projection on rho-ball around x1
+                if not _pgd_step(perturbation, objective_gradient, step_buf, rho, self.step_size,
+                                 self.inf_norm, norm_scale):
                     print(f"    zero gradient, stopping")
                     break
-                perturbation += perturbation_step
-                # projecting on rho-ball around x1
-                if self._norm(perturbation) > rho:
-                    perturbation = self._project(perturbation, rho)
 
             # end of run
             if found:
                 if self.shrinking_repeats:
-                    if self._norm(perturbation) < best_perturbation_norm:
-                        best_perturbation_norm = self._norm(perturbation)
+                    perturbation_norm = self._norm(perturbation)
+                    if perturbation_norm < best_perturbation_norm:
+                        best_perturbation_norm = perturbation_norm
                         best_perturbation = perturbation
                         rho = best_perturbation_norm
                 else: # regular repeats
@@ -38,6 +38,7 @@ def main():
 
     settings = run_params['settings']
     df = pd.DataFrame(columns=get_data_cols(len(G.nodes())))
+    row_buf = np.empty(len(df.columns))
     s_delta = settings['synchronizer']['delta']
     outgoing_pkgs_nums = {}
 
@@ -48,7 +49,7 @@ def main():
             time = cur_time + s_delta
             pkg = Package(pkg_id, size, d, time, 0, None)
             for (i, n) in enumerate(path):
-                df.loc[len(df)] = mk_current_neural_state(G, time, pkg, n)
+                df.loc[len(df)] = mk_current_neural_state(G, time, pkg, n, out=row_buf)
                 if i < len(path) - 1:
                     time += G.get_edge_data(n, path[i+1])['weight']
             df.to_csv(logfile, header=False, index=False)